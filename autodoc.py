@@ -7,19 +7,31 @@ this formats types in a more readable way for CLI help text:
 - Extracts and displays descriptions from Annotated types
 - Formats parameters one per line for better readability
 """
-import sys
 import inspect
+from functools import lru_cache
 from typing import get_origin, get_args, Annotated, Literal
-from inspect import getmembers, isfunction, stack
+from inspect import getmembers, isfunction
 
-def _fmt_type(ann):
-    if get_origin(ann) is Literal:
-        vals = get_args(ann)
-        return ' | '.join(repr(v) for v in vals)
-    if get_origin(ann) is Annotated:
-        return _fmt_type(get_args(ann)[0])
+def _fmt_plain(ann):
     return ann.__name__ if hasattr(ann, '__name__') else str(ann)
 
+def _fmt_literal(ann):
+    return ' | '.join(repr(v) for v in get_args(ann))
+
+def _fmt_annotated(ann):
+    # Only the annotated base type is formatted; the metadata is not
+    base = get_args(ann)[0]
+    if get_origin(base) is Literal:
+        return _fmt_literal(base)
+    return _fmt_plain(base)
+
+_FMT_DISPATCH = {Literal: _fmt_literal, Annotated: _fmt_annotated}
+
+@lru_cache(maxsize=None)
+def _fmt_type(ann):
+    handler = _FMT_DISPATCH.get(get_origin(ann), _fmt_plain)
+    return handler(ann)
+
 def _fmt_param(p):
     default_str = '' if p.default == inspect.Parameter.empty else f" = {repr(p.default)}"
     ann = p.annotation
@@ -43,12 +55,12 @@ def _fmt_param(p):
 
     return [f"{p.name}: {_fmt_type(ann)}{default_str}"]
 
-def mydoc(m=None):
-    if not m:
-        m = (dict((name, func) for name, func
-                  in getmembers(sys.modules[__name__]))[stack()[1][3]])
-    sig = inspect.signature(m)
-    d = inspect.getdoc(m)
+@lru_cache(maxsize=None)
+def _sig_doc(m):
+    return inspect.signature(m), inspect.getdoc(m)
+
+def mydoc(m):
+    sig, d = _sig_doc(m)
     prefix = f"{m.__module__}." if m.__module__ != '__main__' else ''
     if d:
         params = list(sig.parameters.values())
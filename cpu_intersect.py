@@ -17,20 +17,76 @@ systemd services, containers, etc.) on the same node.
 """
 
 import argparse
-from pathlib import Path
+import operator
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial, reduce
 
+from proc_io import iter_pids, read_proc_file, stat_pid
 
-def parse_cpus_allowed(mask):
-    """Convert hex CPU mask to set of CPU numbers."""
-    cpus = set()
-    val = int(mask.replace(',', ''), 16)
-    bit = 0
-    while val:
-        if val & 1:
-            cpus.add(bit)
-        val >>= 1
-        bit += 1
-    return cpus
+# Thread pool size and PIDs per task for the /proc scan
+SCAN_WORKERS = 16
+SCAN_CHUNK = 32
+
+# pid -> (ctime of /proc/<pid>, read time, cgroup identifier). Cgroup
+# membership rarely changes, so the cgroup file is only re-read when the PID
+# directory is new or the entry is older than CGROUP_CACHE_TTL seconds; the
+# age limit catches processes moved to another cgroup after they started.
+CGROUP_CACHE_TTL = 5.0
+_cgroup_cache = {}
+
+
+@dataclass(slots=True)
+class ProcTable:
+    """Process information as parallel lists; index i describes one process."""
+    pids: list[str] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    cpus_masks: list[int] = field(default_factory=list)
+    cgroups: list[str | None] = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.pids)
+
+    def append(self, pid, name, cpus_mask, cgroup):
+        self.pids.append(pid)
+        self.names.append(name)
+        self.cpus_masks.append(cpus_mask)
+        self.cgroups.append(cgroup)
+
+
+def parse_cpus_mask(mask):
+    """Convert hex CPU mask to an integer bitmask (bit N set = CPU N)."""
+    return int(mask.replace(',', ''), 16)
+
+
+def cpu_in_mask(mask, cpu_num):
+    """Check whether a CPU number is set in a hex CPU mask."""
+    if cpu_num < 0:
+        return False
+    return bool((parse_cpus_mask(mask) >> cpu_num) & 1)
+
+
+def parse_status(status):
+    """Extract process name and CPU bitmask from /proc/<pid>/status bytes.
+
+    Returns:
+        Tuple (name, cpus_mask); either may be None if the field is missing.
+    """
+    name = cpus_mask = None
+    pos = 0
+    # The kernel always emits Name: first; Cpus_allowed: comes later, so
+    # its search resumes where the Name: line ends
+    if status.startswith(b'Name:'):
+        if (pos := status.find(b'\n')) < 0:
+            pos = len(status)
+        name = status[5:pos].strip().decode(errors='replace')
+    if (i := status.find(b'\nCpus_allowed:', pos)) >= 0:
+        i += 14
+        j = status.find(b'\n', i)
+        if value := status[i:j if j >= 0 else None].strip():
+            cpus_mask = int(value.replace(b',', b''), 16)
+    return name, cpus_mask
 
 
 def get_cgroup(cgroup_text):
@@ -53,127 +109,185 @@ def get_cgroup(cgroup_text):
     return None
 
 
+def read_cgroup(pid):
+    """Get the cgroup identifier for a PID, reusing the cached value.
+
+    The ctime of /proc/<pid> is set when the process directory is
+    instantiated, so a recycled PID gets a new stamp and a fresh read.
+    Entries also expire after CGROUP_CACHE_TTL seconds, since moving a
+    process to another cgroup does not change that stamp.
+    """
+    stamp = stat_pid(pid).st_ctime_ns
+    now = time.monotonic()
+    if ((cached := _cgroup_cache.get(pid)) and cached[0] == stamp
+            and now - cached[1] < CGROUP_CACHE_TTL):
+        return cached[2]
+
+    cgroup = None
+    if cgroup_text := read_proc_file(pid, 'cgroup').decode():
+        cgroup = get_cgroup(cgroup_text)
+    _cgroup_cache[pid] = (stamp, now, cgroup)
+    return cgroup
+
+
+def _read_one_pid(pid, cpu_filter_mask, ignore_cgroups, ignore_procs):
+    """Get (pid, (name, cpus_mask, cgroup)) for one process.
+
+    The second element is None if the process is filtered out.
+    """
+    try:
+        name, cpus_mask = parse_status(read_proc_file(pid, 'status'))
+
+        # Cheap status-based checks first, so filtered-out processes never
+        # cost a cgroup read
+        if name in ignore_procs or not cpus_mask:
+            return pid, None
+        if cpu_filter_mask is not None and not cpus_mask & cpu_filter_mask:
+            return pid, None
+
+        cgroup = None
+        try:
+            cgroup = read_cgroup(pid)
+        except (PermissionError, FileNotFoundError):
+            pass
+
+        if cgroup not in ignore_cgroups:
+            return pid, (name, cpus_mask, cgroup)
+    except (PermissionError, FileNotFoundError, ProcessLookupError):
+        pass
+    return pid, None
+
+
 def get_proc_info(cpu_filter=None, ignore_cgroups=None, ignore_procs=None):
     """Get CPU affinity and cgroup for all processes.
 
+    The per-process /proc reads release the GIL, so they are spread over a
+    thread pool to overlap their time in the kernel.
+
     Args:
         cpu_filter: Set of CPU numbers to filter by. Only include processes
                    whose CPU affinity intersects with this set.
         ignore_cgroups: Set of cgroup names to ignore.
         ignore_procs: Set of process names to ignore.
+
+    Returns:
+        ProcTable with one entry per matching process.
     """
     if ignore_cgroups is None:
         ignore_cgroups = set()
     if ignore_procs is None:
         ignore_procs = set()
-
-    procs = {}
-    for p in Path('/proc').glob('[0-9]*'):
-        try:
-            status = (p / 'status').read_text()
-            name = cpus_allowed = None
-
-            for line in status.splitlines():
-                if line.startswith('Name:'):
-                    name = line.split(':', 1)[1].strip()
-                elif line.startswith('Cpus_allowed:'):
-                    cpus_allowed = line.split(':', 1)[1].strip()
-
-            if name in ignore_procs:
-                continue
-
-            cgroup = None
-            try:
-                if cgroup_text := (p / 'cgroup').read_text():
-                    cgroup = get_cgroup(cgroup_text)
-            except (PermissionError, FileNotFoundError):
-                pass
-
-            if cgroup in ignore_cgroups:
-                continue
-
-            if cpus_allowed and (cpus := parse_cpus_allowed(cpus_allowed)):
-                if cpu_filter is None or cpus & cpu_filter:
-                    procs[p.name] = {'name': name, 'cpus': cpus, 'cgroup': cgroup}
-        except (PermissionError, FileNotFoundError, ProcessLookupError):
-            pass
+    cpu_filter_mask = None
+    if cpu_filter is not None:
+        # Negative CPU numbers cannot match any process
+        cpu_filter_mask = reduce(operator.or_, (1 << c for c in cpu_filter if c >= 0), 0)
+
+    pids = list(iter_pids())
+    read_one = partial(_read_one_pid, cpu_filter_mask=cpu_filter_mask,
+                       ignore_cgroups=ignore_cgroups, ignore_procs=ignore_procs)
+
+    # ThreadPoolExecutor.map() ignores chunksize, so batch PIDs by hand to
+    # keep the per-task dispatch cost off every single process
+    chunks = [pids[i:i+SCAN_CHUNK] for i in range(0, len(pids), SCAN_CHUNK)]
+    procs = ProcTable()
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as ex:
+        for results in ex.map(lambda chunk: [read_one(pid) for pid in chunk], chunks):
+            for pid, info in results:
+                if info:
+                    procs.append(pid, *info)
+
+    # Drop cache entries for processes that have exited; pop() tolerates a
+    # concurrent scan having already removed the same entry
+    for pid in _cgroup_cache.keys() - set(pids):
+        _cgroup_cache.pop(pid, None)
     return procs
 
 
-def find_cgroup_mismatches(procs, verbose=False):
-    """Find cgroups with intersecting CPUs. O(n + c²) vs O(n²)."""
-    # Group processes by cgroup
+def group_by_cgroup(procs):
+    """Group processes by cgroup, computing each cgroup's CPU mask union.
+
+    Returns:
+        Tuple (by_cgroup, cgroup_mask, no_cgroup): cgroup -> list of process
+        indices, cgroup -> OR of their CPU masks, and indices of processes
+        without a cgroup.
+    """
     by_cgroup = {}
-    for pid, info in procs.items():
-        if cg := info['cgroup']:
-            by_cgroup.setdefault(cg, []).append(pid)
+    cgroup_mask = {}
+    no_cgroup = []
+    for i, (cg, mask) in enumerate(zip(procs.cgroups, procs.cpus_masks)):
+        if cg:
+            by_cgroup.setdefault(cg, []).append(i)
+            cgroup_mask[cg] = cgroup_mask.get(cg, 0) | mask
+        else:
+            no_cgroup.append(i)
+    return by_cgroup, cgroup_mask, no_cgroup
 
-    # Compute CPU union per cgroup
-    cgroup_cpus = {}
-    for cg, pids in by_cgroup.items():
-        cgroup_cpus[cg] = set().union(*(procs[pid]['cpus'] for pid in pids))
+
+def find_cgroup_mismatches(procs, verbose=False):
+    """Find cgroups with intersecting CPUs. O(n + c²) vs O(n²).
+
+    Returns:
+        List of (index1, index2, shared_mask) tuples, indexing into procs.
+    """
+    by_cgroup, cgroup_mask, _ = group_by_cgroup(procs)
 
     if verbose:
-        print(f"Cgroups: {len(cgroup_cpus)}, Processes: {len(procs)}")
-        for cg, cpus in sorted(cgroup_cpus.items()):
-            print(f"  {cg}: {len(by_cgroup[cg])} procs, {len(cpus)} CPUs")
+        print(f"Cgroups: {len(cgroup_mask)}, Processes: {len(procs)}")
+        for cg, mask in sorted(cgroup_mask.items()):
+            print(f"  {cg}: {len(by_cgroup[cg])} procs, {mask.bit_count()} CPUs")
         print()
 
+    # OR of every mask after position i, so cgroups that cannot overlap with
+    # any later cgroup skip the inner loop entirely
+    items = list(cgroup_mask.items())
+    later_mask = [0] * (len(items) + 1)
+    for i in range(len(items) - 1, -1, -1):
+        later_mask[i] = later_mask[i+1] | items[i][1]
+
     # Compare cgroup pairs
     mismatches = []
-    cgroups = list(cgroup_cpus.keys())
-    for i, cg1 in enumerate(cgroups):
-        for cg2 in cgroups[i+1:]:
-            if shared := cgroup_cpus[cg1] & cgroup_cpus[cg2]:
+    for i, (cg1, mask1) in enumerate(items):
+        if not mask1 & later_mask[i+1]:
+            continue
+        for cg2, mask2 in items[i+1:]:
+            if shared := mask1 & mask2:
                 # Show all process pairs
-                for pid1 in by_cgroup[cg1]:
-                    for pid2 in by_cgroup[cg2]:
-                        mismatches.append((pid1, pid2, shared))
+                for idx1 in by_cgroup[cg1]:
+                    for idx2 in by_cgroup[cg2]:
+                        mismatches.append((idx1, idx2, shared))
 
     return mismatches
 
 
-def fmt_cpus(cpus):
-    """Format CPU set as compact ranges (e.g., 0-3,5,7-9)."""
-    if not cpus:
-        return ""
-    sorted_cpus = sorted(cpus)
+def fmt_cpus(mask):
+    """Format CPU bitmask as compact ranges (e.g., 0-3,5,7-9)."""
+    # Bits where a run of set bits begins and ends; the n-th start pairs
+    # with the n-th end, so the loop runs once per range, not once per CPU
+    starts = mask & ~(mask << 1)
+    ends = mask & ~(mask >> 1)
     ranges = []
-    start = end = sorted_cpus[0]
-
-    for cpu in sorted_cpus[1:]:
-        if cpu == end + 1:
-            end = cpu
-        else:
-            ranges.append(f"{start}-{end}" if start != end else str(start))
-            start = end = cpu
-    ranges.append(f"{start}-{end}" if start != end else str(start))
+    while starts:
+        low_start = starts & -starts
+        low_end = ends & -ends
+        start = low_start.bit_length() - 1
+        end = low_end.bit_length() - 1
+        ranges.append(f"{start}-{end}" if start != end else str(start))
+        starts ^= low_start
+        ends ^= low_end
     return ",".join(ranges)
 
 
 def print_stats(procs):
     """Print statistics for cgroups and processes."""
-    # Group by cgroup
-    by_cgroup = {}
-    no_cgroup = []
-    for pid, info in procs.items():
-        if cg := info['cgroup']:
-            by_cgroup.setdefault(cg, []).append(pid)
-        else:
-            no_cgroup.append(pid)
-
-    # Compute CPU union per cgroup
-    cgroup_cpus = {}
-    for cg, pids in by_cgroup.items():
-        cgroup_cpus[cg] = set().union(*(procs[pid]['cpus'] for pid in pids))
+    by_cgroup, cgroup_mask, no_cgroup = group_by_cgroup(procs)
 
     # Sort by process count descending, show top 20
     sorted_cgroups = sorted(by_cgroup.items(), key=lambda x: len(x[1]), reverse=True)[:20]
 
     print(f"Processes: {len(procs)}, Cgroups: {len(by_cgroup)}, No cgroup: {len(no_cgroup)}")
-    for cg, pids in sorted_cgroups:
-        cpus = cgroup_cpus[cg]
-        print(f"{cg}: {len(pids)} procs, CPUs: {fmt_cpus(cpus)} ({len(cpus)} total)")
+    for cg, idxs in sorted_cgroups:
+        mask = cgroup_mask[cg]
+        print(f"{cg}: {len(idxs)} procs, CPUs: {fmt_cpus(mask)} ({mask.bit_count()} total)")
 
 
 if __name__ == '__main__':
@@ -208,9 +322,7 @@ if __name__ == '__main__':
     if not mismatches:
         print("No processes with intersecting CPUs and mismatched cgroups found")
     else:
-        for pid1, pid2, shared in mismatches:
-            p1 = procs[pid1]
-            p2 = procs[pid2]
-            print(f"{pid1:>6} {p1['name']:20} cgroup {p1['cgroup']}")
-            print(f"{pid2:>6} {p2['name']:20} cgroup {p2['cgroup']}")
+        for i1, i2, shared in mismatches:
+            print(f"{procs.pids[i1]:>6} {procs.names[i1]:20} cgroup {procs.cgroups[i1]}")
+            print(f"{procs.pids[i2]:>6} {procs.names[i2]:20} cgroup {procs.cgroups[i2]}")
             print(f"       Shared CPUs: {fmt_cpus(shared)}\n")
@@ -8,7 +8,7 @@ includes the specified CPU number.
 
 import argparse
 from pathlib import Path
-from cpu_intersect import parse_cpus_allowed
+from cpu_intersect import cpu_in_mask
 
 
 def get_irq_for_cpu(cpu_num):
@@ -29,10 +29,8 @@ def get_irq_for_cpu(cpu_num):
                 if len(dirs) > 0:
                     name = dirs[0]
 
-            if cpus_allowed:
-                cpus = parse_cpus_allowed(cpus_allowed)
-                if int(cpu_num) in cpus:
-                    procs.append((int(p.name), name))
+            if cpus_allowed and cpu_in_mask(cpus_allowed, int(cpu_num)):
+                procs.append((int(p.name), name))
         except (PermissionError, FileNotFoundError, ProcessLookupError):
             pass
 
@@ -7,8 +7,8 @@ includes the specified CPU number.
 """
 
 import argparse
-from pathlib import Path
-from cpu_intersect import parse_cpus_allowed
+from cpu_intersect import parse_status
+from proc_io import iter_pids, read_proc_file
 
 
 def get_processes_for_cpu(cpu_num):
@@ -21,21 +21,18 @@ def get_processes_for_cpu(cpu_num):
         List of tuples: [(pid, process_name), ...]
     """
     procs = []
-    for p in Path('/proc').glob('[0-9]*'):
+    cpu_num = int(cpu_num)
+    if cpu_num < 0:
+        # No process can be allowed on a negative CPU number
+        return procs
+    cpu_bit = 1 << cpu_num
+
+    for pid in iter_pids():
         try:
-            status = (p / 'status').read_text()
-            name = cpus_allowed = None
-
-            for line in status.splitlines():
-                if line.startswith('Name:'):
-                    name = line.split(':', 1)[1].strip()
-                elif line.startswith('Cpus_allowed:'):
-                    cpus_allowed = line.split(':', 1)[1].strip()
-
-            if cpus_allowed and name:
-                cpus = parse_cpus_allowed(cpus_allowed)
-                if int(cpu_num) in cpus:
-                    procs.append((int(p.name), name))
+            name, cpus_mask = parse_status(read_proc_file(pid, 'status'))
+
+            if cpus_mask and name and cpus_mask & cpu_bit:
+                procs.append((int(pid), name))
         except (PermissionError, FileNotFoundError, ProcessLookupError):
             pass
 
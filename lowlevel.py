@@ -3,9 +3,13 @@
 Provides tools for CPU affinity analysis, MSR register access, and ethtool queries.
 """
 from typing import Annotated, Literal
+import errno
+import functools
+import io
 import subprocess
 import sys
 import os
+import time
 from fastmcp import FastMCP
 import cpu_intersect
 import list_allowed_irqs_per_cpu
@@ -23,7 +27,46 @@ mcp = FastMCP(
     """,
 )
 
+def _ttl_cache(ttl=0.5):
+    """Reuse a tool's last result when called again with the same arguments
+    within ttl seconds. Setting NO_CACHE=1 in the environment disables it.
+    """
+    def deco(fn):
+        if os.environ.get('NO_CACHE') == '1':
+            return fn
+        last = None
+
+        @functools.wraps(fn)
+        def wrap(*args, **kwargs):
+            nonlocal last
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            if last and now - last[0] < ttl and last[1] == key:
+                return last[2]
+            result = fn(*args, **kwargs)
+            last = (now, key, result)
+            return result
+        return wrap
+    return deco
+
+
+# Open /dev/cpu/<N>/msr descriptors, kept across calls
+_msr_fds = {}
+
+
+def _read_msr(cpu, reg):
+    fd = _msr_fds.get(cpu)
+    if fd is None:
+        new_fd = os.open(f'/dev/cpu/{cpu}/msr', os.O_RDONLY | os.O_CLOEXEC)
+        # Another call may have cached a descriptor meanwhile; keep that one
+        fd = _msr_fds.setdefault(cpu, new_fd)
+        if fd != new_fd:
+            os.close(new_fd)
+    return int.from_bytes(os.pread(fd, 8, reg), 'little')
+
+
 @mcp.tool()
+@_ttl_cache()
 def find_cpu_intersections(
     cpus: str = "",
     ignore_cgroups: str = "",
@@ -49,24 +92,26 @@ def find_cpu_intersections(
     procs = cpu_intersect.get_proc_info(cpu_filter, ignore_cg, ignore_pr)
     mismatches = cpu_intersect.find_cgroup_mismatches(procs)
 
-    output = []
     if not mismatches:
-        output.append("No processes with intersecting CPUs and mismatched cgroups found")
-    else:
-        for pid1, pid2, shared in mismatches:
-            p1 = procs[pid1]
-            p2 = procs[pid2]
-            output.append(f"{pid1:>6} {p1['name']:20} cgroup {p1['cgroup']}")
-            output.append(f"{pid2:>6} {p2['name']:20} cgroup {p2['cgroup']}")
-            output.append(f"       Shared CPUs: {cpu_intersect.fmt_cpus(shared)}\n")
+        return "No processes with intersecting CPUs and mismatched cgroups found"
 
-    return "\n".join(output)
+    buf = io.StringIO()
+    w = buf.write
+    for n, (i1, i2, shared) in enumerate(mismatches):
+        if n:
+            w("\n")
+        w(f"{procs.pids[i1]:>6} {procs.names[i1]:20} cgroup {procs.cgroups[i1]}\n")
+        w(f"{procs.pids[i2]:>6} {procs.names[i2]:20} cgroup {procs.cgroups[i2]}\n")
+        w(f"       Shared CPUs: {cpu_intersect.fmt_cpus(shared)}\n")
+
+    return buf.getvalue()
 
 @mcp.tool(annotations={
             "readOnlyHint": True,
             "destructiveHint": False
             }
 )
+@_ttl_cache()
 def list_processes_for_cpu(
         cpu: Annotated[int, "CPU number (0-based)"]
     ) -> str:
@@ -83,11 +128,13 @@ def list_processes_for_cpu(
     if not procs:
         return f"No processes found for CPU {cpu}"
 
-    output = [f"Processes allowed on CPU {cpu} ({len(procs)} total):"]
+    buf = io.StringIO()
+    w = buf.write
+    w(f"Processes allowed on CPU {cpu} ({len(procs)} total):")
     for pid, name in procs:
-        output.append(f"{pid:>6}  {name}")
+        w(f"\n{pid:>6}  {name}")
 
-    return "\n".join(output)
+    return buf.getvalue()
 
 
 @mcp.tool(annotations={
@@ -112,11 +159,13 @@ def list_irqs_for_cpu(
     if not procs:
         return f"No IRQs found for CPU {cpu}"
 
-    output = [f"IRQs allowed on CPU {cpu} ({len(procs)} total):"]
+    buf = io.StringIO()
+    w = buf.write
+    w(f"IRQs allowed on CPU {cpu} ({len(procs)} total):")
     for irq, name in procs:
-        output.append(f"{irq:>6}  {name}")
+        w(f"\n{irq:>6}  {name}")
 
-    return "\n".join(output)
+    return buf.getvalue()
 
 
 @mcp.tool(annotations={
@@ -133,7 +182,29 @@ def read_msr_register(
     Returns:
         The MSR register value, in hexadecimal.
     """
-    args = ["/usr/sbin/rdmsr", "-x", "-p", str(cpu), register]
+    try:
+        reg = int(register, 16)
+    except ValueError as e:
+        return f"Error: {e}\n"
+
+    try:
+        return f"{_read_msr(cpu, reg):x}\n"
+    except PermissionError:
+        # No direct access to the msr device, go through rdmsr (and sudo)
+        pass
+    except OSError as e:
+        # The device is gone (e.g. the CPU went offline): drop the cached
+        # descriptor so the next call reopens it. Other errors, such as EIO
+        # for an unsupported register, leave the descriptor usable.
+        if e.errno in (errno.ENXIO, errno.ENODEV):
+            if (fd := _msr_fds.pop(cpu, None)) is not None:
+                os.close(fd)
+        return f"Error: {e}\n"
+    except OverflowError as e:
+        return f"Error: {e}\n"
+
+    # rdmsr parses its argument with strtoul(..., 0), so pass it prefixed
+    args = ["/usr/sbin/rdmsr", "-x", "-p", str(cpu), f"{reg:#x}"]
     if os.getuid() != 0:
         args = ['sudo'] + args
     result = subprocess.run(args, text=True, capture_output=True, check=False)
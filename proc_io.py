@@ -0,0 +1,40 @@
+"""Low-overhead readers for small procfs files.
+
+pathlib's read_text() goes through the buffered io stack, which costs an
+fstat, an ioctl and an lseek on top of the open/read/close that a procfs
+file actually needs, plus a decode of the whole file. These helpers issue
+only the raw syscalls and return bytes, leaving decoding to the caller.
+Files are opened relative to a directory descriptor for /proc that is kept
+open for the lifetime of the process, saving the /proc lookup on every path.
+"""
+import os
+
+# Large enough for /proc/<pid>/status and /proc/<pid>/cgroup in one read
+READ_SIZE = 4096
+
+_PROC_DIRFD = os.open('/proc', os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+
+
+def read_proc_file(pid, name):
+    """Read /proc/<pid>/<name> and return its raw contents as bytes."""
+    fd = os.open(f'{pid}/{name}', os.O_RDONLY | os.O_CLOEXEC, dir_fd=_PROC_DIRFD)
+    try:
+        buf = os.read(fd, READ_SIZE)
+        while chunk := os.read(fd, READ_SIZE):
+            buf += chunk
+        return buf
+    finally:
+        os.close(fd)
+
+
+def stat_pid(pid):
+    """Return the os.stat_result of the /proc/<pid> directory."""
+    return os.stat(pid, dir_fd=_PROC_DIRFD)
+
+
+def iter_pids():
+    """Yield the PID of every process listed in /proc, as a string."""
+    with os.scandir('/proc') as it:
+        for entry in it:
+            if entry.name[0].isdigit():
+                yield entry.name